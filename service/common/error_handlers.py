@@ -14,10 +14,10 @@
 """
 Module: error_handlers
 """
-from flask import jsonify
 from service.models import DataValidationError
 from service import app
 from . import status
+from .json_response import orjson_response
 
 
 ######################################################################
@@ -34,10 +34,12 @@ def bad_request(error):
     """Handles bad requests with 400_BAD_REQUEST"""
     message = str(error)
     app.logger.warning(message)
-    return (
-        jsonify(
-            status=status.HTTP_400_BAD_REQUEST, error="Bad Request", message=message
-        ),
+    return orjson_response(
+        {
+            "status": status.HTTP_400_BAD_REQUEST,
+            "error": "Bad Request",
+            "message": message,
+        },
         status.HTTP_400_BAD_REQUEST,
     )
 
@@ -47,8 +49,12 @@ def not_found(error):
     """Handles resources not found with 404_NOT_FOUND"""
     message = str(error)
     app.logger.warning(message)
-    return (
-        jsonify(status=status.HTTP_404_NOT_FOUND, error="Not Found", message=message),
+    return orjson_response(
+        {
+            "status": status.HTTP_404_NOT_FOUND,
+            "error": "Not Found",
+            "message": message,
+        },
         status.HTTP_404_NOT_FOUND,
     )
 
@@ -58,12 +64,12 @@ def method_not_supported(error):
     """Handles unsupported HTTP methods with 405_METHOD_NOT_SUPPORTED"""
     message = str(error)
     app.logger.warning(message)
-    return (
-        jsonify(
-            status=status.HTTP_405_METHOD_NOT_ALLOWED,
-            error="Method not Allowed",
-            message=message,
-        ),
+    return orjson_response(
+        {
+            "status": status.HTTP_405_METHOD_NOT_ALLOWED,
+            "error": "Method not Allowed",
+            "message": message,
+        },
         status.HTTP_405_METHOD_NOT_ALLOWED,
     )
 
@@ -73,12 +79,12 @@ def mediatype_not_supported(error):
     """Handles unsupported media requests with 415_UNSUPPORTED_MEDIA_TYPE"""
     message = str(error)
     app.logger.warning(message)
-    return (
-        jsonify(
-            status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
-            error="Unsupported media type",
-            message=message,
-        ),
+    return orjson_response(
+        {
+            "status": status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            "error": "Unsupported media type",
+            "message": message,
+        },
         status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
     )
 
@@ -88,11 +94,11 @@ def internal_server_error(error):
     """Handles unexpected server error with 500_SERVER_ERROR"""
     message = str(error)
     app.logger.error(message)
-    return (
-        jsonify(
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            error="Internal Server Error",
-            message=message,
-        ),
+    return orjson_response(
+        {
+            "status": status.HTTP_500_INTERNAL_SERVER_ERROR,
+            "error": "Internal Server Error",
+            "message": message,
+        },
         status.HTTP_500_INTERNAL_SERVER_ERROR,
     )
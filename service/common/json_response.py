@@ -0,0 +1,38 @@
+######################################################################
+# Copyright 2016, 2021 John J. Rofrano. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+######################################################################
+
+"""
+Module: json_response
+
+JSON responses encoded with orjson instead of the standard library
+"""
+import orjson
+from flask import Response
+
+
+def dumps(obj) -> bytes:
+    """Encodes obj as JSON bytes"""
+    return orjson.dumps(obj, option=orjson.OPT_NAIVE_UTC)
+
+
+def json_bytes_response(body: bytes, status_code=200, headers=None):
+    """Returns a Flask Response for an already encoded JSON body"""
+    return Response(body, status=status_code, mimetype="application/json", headers=headers)
+
+
+def orjson_response(obj, status_code=200, headers=None):
+    """Returns a Flask Response with obj encoded as JSON by orjson"""
+    return json_bytes_response(dumps(obj), status_code, headers)
@@ -26,18 +26,26 @@ Attributes:
 name (string) - the name of the product
 description (string) - the description the product belongs to (i.e., dog, cat)
 available (boolean) - True for products that are available for adoption
+updated_at (datetime) - when the product was created or last changed
 
 """
 import logging
+from datetime import datetime
 from enum import Enum
 from decimal import Decimal
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import selectinload
 
 logger = logging.getLogger("flask.app")
 
+# Number of rows fetched per round trip when streaming query results
+ROW_BATCH_SIZE = 500
+
 # Create the SQLAlchemy object to be initialized later in init_db()
-db = SQLAlchemy()
+# Committed objects are not expired, so serializing a Product right after
+# create() or update() does not read the row back from the database
+db = SQLAlchemy(session_options={"expire_on_commit": False})
 
 
 def init_db(app):
@@ -60,6 +68,13 @@ class Category(Enum):
     TOOLS = 5
 
 
+# Category members by name for deserialize()
+_CATEGORY_BY_NAME = {c.name: c for c in Category}
+
+# Category names by member for serialize() and iter_rows()
+_CATEGORY_NAME_CACHE = {c: c.name for c in Category}
+
+
 class Product(db.Model):
     """
     Class that represents a Product
@@ -79,6 +94,17 @@ class Product(db.Model):
     category = db.Column(
         db.Enum(Category), nullable=False, server_default=(Category.UNKNOWN.name)
     )
+    updated_at = db.Column(
+        db.DateTime,
+        nullable=False,
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+        server_default=db.func.now(),  # lets ALTER TABLE fill existing rows
+    )
+
+    # Relationships to load eagerly with every lookup so that touching them
+    # on a found Product never issues a lazy SELECT per instance
+    _EAGER_RELS = ()
 
     ##################################################
     # INSTANCE METHODS
@@ -94,6 +120,8 @@ class Product(db.Model):
         logger.info("Creating %s", self.name)
         # id must be none to generate next primary key
         self.id = None  # pylint: disable=invalid-name
+        # the flush is a single INSERT ... RETURNING id on PostgreSQL and,
+        # with expire_on_commit off, nothing is read back after the commit
         db.session.add(self)
         db.session.commit()
 
@@ -120,7 +148,7 @@ class Product(db.Model):
             "description": self.description,
             "price": str(self.price),
             "available": self.available,
-            "category": self.category.name  # convert enum to string
+            "category": _CATEGORY_NAME_CACHE[self.category]  # convert enum to string
         }
 
     def deserialize(self, data: dict):
@@ -140,9 +168,10 @@ class Product(db.Model):
                     "Invalid type for boolean [available]: "
                     + str(type(data["available"]))
                 )
-            self.category = getattr(Category, data["category"])  # create enum from string
-        except AttributeError as error:
-            raise DataValidationError("Invalid attribute: " + error.args[0]) from error
+            category = _CATEGORY_BY_NAME.get(data["category"])  # create enum from string
+            if category is None:
+                raise DataValidationError("Invalid attribute: unknown category " + str(data["category"]))
+            self.category = category
         except KeyError as error:
             raise DataValidationError("Invalid product: missing " + error.args[0]) from error
         except TypeError as error:
@@ -169,11 +198,100 @@ class Product(db.Model):
         app.app_context().push()
         db.create_all()  # make our sqlalchemy tables
 
+    @classmethod
+    def _loader_options(cls) -> list:
+        """Returns the eager loader options for the relationships in _EAGER_RELS"""
+        return [selectinload(getattr(cls, rel)) for rel in cls._EAGER_RELS]
+
+    @classmethod
+    def bulk_create(cls, products: list):
+        """Creates many Products in the database with a single commit
+
+        :param products: the Products to create
+        :type products: list
+
+        """
+        logger.info("Creating %d Products", len(products))
+        for product in products:
+            # id must be none to generate next primary key
+            product.id = None
+        db.session.add_all(products)
+        db.session.commit()
+
     @classmethod
     def all(cls) -> list:
         """Returns all of the Products in the database"""
-        logger.info("Processing all Products")
-        return cls.query.all()
+        logger.debug("Processing all Products")
+        return cls.query.options(*cls._loader_options()).all()
+
+    @classmethod
+    def _row_filters(cls, name: str, category: Category, available: bool) -> list:
+        """Returns the WHERE clauses for the given list filters"""
+        clauses = []
+        if name is not None:
+            clauses.append(cls.name == name)
+        if category is not None:
+            clauses.append(cls.category == category)
+        if available is not None:
+            clauses.append(cls.available == available)
+        return clauses
+
+    @classmethod
+    def list_version(cls, name: str = None, category: Category = None, available: bool = None) -> tuple:
+        """Returns a cheap version stamp for the Products a list would return
+
+        Any create, update or delete of a matching Product changes either
+        the number of matches or the latest updated_at among them
+
+        :return: the number of matching Products and their latest updated_at
+        :rtype: tuple
+
+        """
+        logger.debug("Processing version query for %s, %s, %s ...", name, category, available)
+        stmt = db.select(db.func.count(cls.id), db.func.max(cls.updated_at)).where(
+            *cls._row_filters(name, category, available)
+        )
+        return tuple(db.session.execute(stmt).one())
+
+    @classmethod
+    def iter_rows(cls, name: str = None, category: Category = None, available: bool = None):
+        """Yields serialized Products straight from the database
+
+        Selects only the Product columns with a Core query and builds the
+        dictionaries from the result tuples, skipping ORM instances entirely.
+        Rows are fetched from the database in batches of ROW_BATCH_SIZE
+
+        :param name: only return Products with this name
+        :type name: str
+        :param category: only return Products in this Category
+        :type category: enum
+        :param available: only return Products with this availability
+        :type available: bool
+
+        :return: a generator of dictionaries shaped like serialize()
+        :rtype: generator
+
+        """
+        logger.debug("Processing row query for %s, %s, %s ...", name, category, available)
+        stmt = db.select(
+            cls.id, cls.name, cls.description, cls.price, cls.available, cls.category
+        ).where(*cls._row_filters(name, category, available))
+        result = db.session.execute(stmt.execution_options(yield_per=ROW_BATCH_SIZE))
+        for row in result:
+            yield {
+                "id": row.id,
+                "name": row.name,
+                "description": row.description,
+                "price": str(row.price),
+                "available": row.available,
+                "category": _CATEGORY_NAME_CACHE[row.category]
+            }
+
+    @classmethod
+    def count(cls) -> int:
+        """Returns the number of Products in the database"""
+        logger.debug("Processing count of all Products")
+        return db.session.scalar(db.select(db.func.count()).select_from(cls))
 
     @classmethod
     def find(cls, product_id: int):
@@ -186,8 +304,8 @@ class Product(db.Model):
         :rtype: Product
 
         """
-        logger.info("Processing lookup for id %s ...", product_id)
-        return cls.query.get(product_id)
+        logger.debug("Processing lookup for id %s ...", product_id)
+        return db.session.get(cls, product_id, options=cls._loader_options())
 
     @classmethod
     def find_by_name(cls, name: str) -> list:
@@ -200,8 +318,8 @@ class Product(db.Model):
         :rtype: list
 
         """
-        logger.info("Processing name query for %s ...", name)
-        return cls.query.filter(cls.name == name)
+        logger.debug("Processing name query for %s ...", name)
+        return cls.query.options(*cls._loader_options()).filter(cls.name == name)
 
     @classmethod
     def find_by_price(cls, price: Decimal) -> list:
@@ -214,11 +332,11 @@ class Product(db.Model):
         :rtype: list
 
         """
-        logger.info("Processing price query for %s ...", price)
+        logger.debug("Processing price query for %s ...", price)
         price_value = price
         if isinstance(price, str):
             price_value = Decimal(price.strip(' "'))
-        return cls.query.filter(cls.price == price_value)
+        return cls.query.options(*cls._loader_options()).filter(cls.price == price_value)
 
     @classmethod
     def find_by_availability(cls, available: bool = True) -> list:
@@ -231,8 +349,8 @@ class Product(db.Model):
         :rtype: list
 
         """
-        logger.info("Processing available query for %s ...", available)
-        return cls.query.filter(cls.available == available)
+        logger.debug("Processing available query for %s ...", available)
+        return cls.query.options(*cls._loader_options()).filter(cls.available == available)
 
     @classmethod
     def find_by_category(cls, category: Category = Category.UNKNOWN) -> list:
@@ -245,5 +363,5 @@ class Product(db.Model):
         :rtype: list
 
         """
-        logger.info("Processing category query for %s ...", category.name)
-        return cls.query.filter(cls.category == category)
+        logger.debug("Processing category query for %s ...", category.name)
+        return cls.query.options(*cls._loader_options()).filter(cls.category == category)
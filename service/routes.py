@@ -13,11 +13,29 @@
 # limitations under the License.
 """Product Store Service with UI"""
 
-from flask import jsonify, request, abort, url_for
-from service.models import Product, Category
+import hashlib
+from pathlib import Path
+import orjson
+from flask import Response, request, abort, stream_with_context
+from service.models import Product, Category, ROW_BATCH_SIZE
 from service.common import status
+from service.common.json_response import dumps, orjson_response
 from . import app
 
+# The home page is static, so it is read and tagged once at startup
+_INDEX_BYTES = Path(app.static_folder, "index.html").read_bytes()
+_INDEX_ETAG = hashlib.blake2b(_INDEX_BYTES, digest_size=16).hexdigest()
+
+# Path of get_product relative to the application root, used to build
+# Location headers without a URL map lookup
+PRODUCT_PATH = "products/{}"
+
+# Query string values accepted as true for ?available=
+_TRUTHY = frozenset(("true", "yes", "1", "t", "y", "on"))
+
+# Category members by case-folded name for ?category=
+_CATEGORY_MAP_CI = {c.name.casefold(): c for c in Category}
+
 
 ######################################################################
 # H E A L T H   C H E C K
@@ -25,7 +43,7 @@ from . import app
 @app.route("/health")
 def healthcheck():
     """Let them know our heart is still beating"""
-    return jsonify(status=200, message="OK"), status.HTTP_200_OK
+    return orjson_response({"status": 200, "message": "OK"}, status.HTTP_200_OK)
 
 
 ######################################################################
@@ -34,7 +52,13 @@ def healthcheck():
 @app.route("/")
 def index():
     """Base URL for our service"""
-    return app.send_static_file("index.html")
+    if request.if_none_match.contains(_INDEX_ETAG):
+        return not_modified(_INDEX_ETAG)
+    response = Response(_INDEX_BYTES, status=status.HTTP_200_OK, mimetype="text/html")
+    response.set_etag(_INDEX_ETAG)
+    response.cache_control.public = True
+    response.cache_control.max_age = 300
+    return response
 
 
 ######################################################################
@@ -42,13 +66,51 @@ def index():
 ######################################################################
 def check_content_type(content_type):
     """Checks that the media type is correct"""
-    if "Content-Type" not in request.headers:
-        app.logger.error("No Content-Type specified.")
-        abort(status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, f"Content-Type must be {content_type}")
-    if request.headers["Content-Type"] != content_type:
-        app.logger.error("Invalid Content-Type: %s", request.headers["Content-Type"])
+    request_type = request.environ.get("CONTENT_TYPE")
+    if request_type != content_type:
+        if request_type is None:
+            app.logger.error("No Content-Type specified.")
+        else:
+            app.logger.error("Invalid Content-Type: %s", request_type)
         abort(status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, f"Content-Type must be {content_type}")
 
+
+def get_request_json():
+    """Parses the raw request body as JSON with orjson"""
+    try:
+        data = orjson.loads(request.get_data(cache=False))
+    except orjson.JSONDecodeError as error:
+        app.logger.error("Malformed JSON body: %s", error)
+        abort(status.HTTP_400_BAD_REQUEST, f"Request body is not valid JSON: {error}")
+    return data
+
+
+def stream_json_array(rows):
+    """Yields rows as one JSON array, ROW_BATCH_SIZE rows per chunk"""
+    batch = []
+    separator = b""
+    count = 0
+    yield b"["
+    for row in rows:
+        batch.append(dumps(row))
+        count += 1
+        if len(batch) == ROW_BATCH_SIZE:
+            yield separator + b",".join(batch)
+            batch = []
+            separator = b","
+    if batch:
+        yield separator + b",".join(batch)
+    yield b"]"
+    app.logger.debug("Returned %d products", count)
+
+
+def not_modified(etag):
+    """Returns an empty 304 Not Modified response carrying etag"""
+    response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    response.set_etag(etag)
+    return response
+
+
 ######################################################################
 # C R E A T E   A   P R O D U C T
 ######################################################################
@@ -58,13 +120,36 @@ def create_products():
     app.logger.info("Request to create a Product")
     check_content_type("application/json")
 
-    data = request.get_json()
+    data = get_request_json()
 
     product = Product()
     product.deserialize(data)
     product.create()
-    location_url = url_for("get_product", product_id=product.id, _external=True)
-    return jsonify(product.serialize()), status.HTTP_201_CREATED, {"Location": location_url}
+    location_url = f"{request.url_root}{PRODUCT_PATH.format(product.id)}"
+    return orjson_response(
+        product.serialize(), status.HTTP_201_CREATED, headers={"Location": location_url}
+    )
+
+
+######################################################################
+# C R E A T E   M A N Y   P R O D U C T S
+######################################################################
+@app.route("/products/bulk", methods=["POST"])
+def bulk_create_products():
+    """Creates Products from a posted JSON array in one transaction"""
+    app.logger.info("Request to create Products in bulk")
+    check_content_type("application/json")
+
+    data = get_request_json()
+    if not isinstance(data, list):
+        abort(status.HTTP_400_BAD_REQUEST, "Request body must be a JSON array of Products")
+
+    products = [Product().deserialize(item) for item in data]
+    Product.bulk_create(products)
+    return orjson_response(
+        [product.serialize() for product in products], status.HTTP_201_CREATED
+    )
+
 
 ######################################################################
 # R E A D   A   P R O D U C T
@@ -76,7 +161,13 @@ def get_product(product_id):
     product = Product.find(product_id)
     if not product:
         abort(status.HTTP_404_NOT_FOUND, f"Product with id '{product_id}' was not found.")
-    return jsonify(product.serialize()), status.HTTP_200_OK
+
+    etag = f"{product.id}-{product.updated_at.timestamp()}"
+    if request.if_none_match.contains(etag):
+        return not_modified(etag)
+    response = orjson_response(product.serialize(), status.HTTP_200_OK)
+    response.set_etag(etag)
+    return response
     
 ######################################################################
 # U P D A T E   A   P R O D U C T
@@ -92,10 +183,9 @@ def update_products(product_id):
     if not product:
         abort(status.HTTP_404_NOT_FOUND, f"Product with id '{product_id}' was not found.")
 
-    product.deserialize(request.get_json())
-    product.id = product_id
+    product.deserialize(get_request_json())
     product.update()
-    return jsonify(product.serialize()), status.HTTP_200_OK
+    return orjson_response(product.serialize(), status.HTTP_200_OK)
 
 
 ######################################################################
@@ -108,7 +198,18 @@ def delete_products(product_id):
     product = Product.find(product_id)
     if product:
         product.delete()
-    return "", status.HTTP_204_NO_CONTENT
+    return b"", status.HTTP_204_NO_CONTENT
+
+
+######################################################################
+# C O U N T   P R O D U C T S
+######################################################################
+@app.route("/products/count", methods=["GET"])
+def count_products():
+    """Returns the number of Products without listing them"""
+    app.logger.info("Request to count Products")
+    return orjson_response({"count": Product.count()}, status.HTTP_200_OK)
+
 
 ######################################################################
 # L I S T   P R O D U C T S
@@ -124,24 +225,30 @@ def list_products():
     category = request.args.get("category")
     available = request.args.get("available")
 
-    try:
-        if name:
-            app.logger.info("Filtering by name: %s", name)
-            products = Product.find_by_name(name)
-        elif category:
-            app.logger.info("Filtering by category: %s", category)
-            category_enum = getattr(Category, category.upper())
-            products = Product.find_by_category(category_enum)
-        elif available:
-            app.logger.info("Filtering by availability: %s", available)
-            available_value = available.lower() in ["true", "yes", "1"]
-            products = Product.find_by_availability(available_value)
-        else:
-            app.logger.info("No filters applied. Returning all products.")
-            products = Product.all()
-    except AttributeError:
-        abort(status.HTTP_400_BAD_REQUEST, f"Invalid category: {category}")
-
-    results = [product.serialize() for product in products]
-    app.logger.info("Returning %d products", len(results))
-    return jsonify(results), status.HTTP_200_OK
+    filters = {}
+    if name:
+        app.logger.debug("Filtering by name: %s", name)
+        filters["name"] = name
+    elif category:
+        app.logger.debug("Filtering by category: %s", category)
+        filters["category"] = _CATEGORY_MAP_CI.get(category.casefold())
+        if filters["category"] is None:
+            abort(status.HTTP_400_BAD_REQUEST, f"Invalid category: {category}")
+    elif available:
+        app.logger.debug("Filtering by availability: %s", available)
+        filters["available"] = available.lower() in _TRUTHY
+    else:
+        app.logger.debug("No filters applied. Returning all products.")
+
+    count, latest = Product.list_version(**filters)
+    etag = f"{count}-{latest.timestamp() if latest else 0}"
+    if request.if_none_match.contains(etag):
+        return not_modified(etag)
+
+    response = Response(
+        stream_with_context(stream_json_array(Product.iter_rows(**filters))),
+        status=status.HTTP_200_OK,
+        mimetype="application/json",
+    )
+    response.set_etag(etag)
+    return response
@@ -16,6 +16,7 @@ import os
 import logging
 import unittest
 from decimal import Decimal
+from sqlalchemy import event
 from service.models import Product, Category, db, DataValidationError
 from service import app
 from tests.factories import ProductFactory
@@ -49,6 +50,13 @@ class TestProductModel(unittest.TestCase):
         """Remove the session after each test"""
         db.session.remove()
 
+    @staticmethod
+    def _insert_products(count):
+        """Inserts count fake Products with a single commit"""
+        products = ProductFactory.create_batch(count)
+        Product.bulk_create(products)
+        return products
+
     def test_create_product(self):
         """It should create a Product and verify its attributes"""
         product = Product(name="Fedora", description="A red hat", price=12.50, available=True, category=Category.CLOTHS)
@@ -84,10 +92,59 @@ class TestProductModel(unittest.TestCase):
         product = ProductFactory()
         product.id = None
         product.create()
+        created_at = product.updated_at
+        self.assertIsNotNone(created_at)
         product.description = "Updated description"
         product.update()
         updated = Product.find(product.id)
         self.assertEqual(updated.description, "Updated description")
+        self.assertGreater(updated.updated_at, created_at)
+
+    def test_bulk_create_products(self):
+        """It should create many Products with a single commit"""
+        products = ProductFactory.create_batch(3)
+        Product.bulk_create(products)
+        for product in products:
+            self.assertIsNotNone(product.id)
+        self.assertEqual(Product.count(), 3)
+
+    def test_create_product_single_statement(self):
+        """It should create and serialize a Product with a single INSERT"""
+        product = ProductFactory()
+        statements = []
+
+        def record(conn, cursor, statement, *args):  # pylint: disable=unused-argument
+            statements.append(statement.lstrip().split()[0].upper())
+
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            product.create()
+            data = product.serialize()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+        self.assertIsNotNone(data["id"])
+        self.assertEqual(statements, ["INSERT"])
+
+    def test_update_product_no_read_back(self):
+        """It should serialize an updated Product without another SELECT"""
+        product = ProductFactory()
+        product.id = None
+        product.create()
+        statements = []
+
+        def record(conn, cursor, statement, *args):  # pylint: disable=unused-argument
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            found = Product.find(product.id)
+            found.description = "Updated description"
+            found.update()
+            data = found.serialize()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+        self.assertEqual(data["description"], "Updated description")
+        self.assertFalse([s for s in statements if s.lstrip().upper().startswith("SELECT")])
 
     def test_delete_product(self):
         """It should delete a Product from the database"""
@@ -106,43 +163,35 @@ class TestProductModel(unittest.TestCase):
             product.id = None
             product.create()
         self.assertEqual(len(Product.all()), 5)
+        self.assertEqual(Product.count(), 5)
 
     def test_find_by_name(self):
         """It should find Products by name"""
-        products = ProductFactory.create_batch(5)
-        for product in products:
-            product.id = None
-            product.create()
+        products = self._insert_products(5)
         target_name = products[0].name
         expected = [p for p in products if p.name == target_name]
-        found = Product.find_by_name(target_name)
-        self.assertEqual(found.count(), len(expected))
+        found = Product.find_by_name(target_name).all()
+        self.assertEqual(len(found), len(expected))
         for product in found:
             self.assertEqual(product.name, target_name)
 
     def test_find_by_category(self):
         """It should find Products by category"""
-        products = ProductFactory.create_batch(10)
-        for product in products:
-            product.id = None
-            product.create()
+        products = self._insert_products(10)
         target_category = products[0].category
         expected = [p for p in products if p.category == target_category]
-        found = Product.find_by_category(target_category)
-        self.assertEqual(found.count(), len(expected))
+        found = Product.find_by_category(target_category).all()
+        self.assertEqual(len(found), len(expected))
         for product in found:
             self.assertEqual(product.category, target_category)
 
     def test_find_by_availability(self):
         """It should find Products by availability"""
-        products = ProductFactory.create_batch(10)
-        for product in products:
-            product.id = None
-            product.create()
+        products = self._insert_products(10)
         target_avail = products[0].available
         expected = [p for p in products if p.available == target_avail]
-        found = Product.find_by_availability(target_avail)
-        self.assertEqual(found.count(), len(expected))
+        found = Product.find_by_availability(target_avail).all()
+        self.assertEqual(len(found), len(expected))
         for product in found:
             self.assertEqual(product.available, target_avail)
 
@@ -155,6 +204,26 @@ class TestProductModel(unittest.TestCase):
         self.assertGreaterEqual(len(found), 1)
         self.assertEqual(found[0].price, Decimal("19.99"))
 
+    def test_iter_rows(self):
+        """It should yield Products as serialized rows"""
+        products = ProductFactory.create_batch(5)
+        for product in products:
+            product.id = None
+            product.create()
+        rows = list(Product.iter_rows())
+        self.assertEqual(len(rows), 5)
+        by_id = {product.id: product for product in products}
+        for row in rows:
+            expected = by_id[row["id"]].serialize()
+            self.assertEqual(Decimal(row.pop("price")), Decimal(expected.pop("price")))
+            self.assertEqual(row, expected)
+        target_category = products[0].category
+        rows = list(Product.iter_rows(category=target_category))
+        expected = [p for p in products if p.category == target_category]
+        self.assertEqual(len(rows), len(expected))
+        for row in rows:
+            self.assertEqual(row["category"], target_category.name)
+
     def test_serialize_product(self):
         """It should serialize a Product to a dictionary"""
         product = ProductFactory()
@@ -203,3 +272,11 @@ class TestProductModel(unittest.TestCase):
         }
         with self.assertRaises(DataValidationError):
             product.deserialize(bad_data)
+
+    def test_deserialize_invalid_category(self):
+        """It should raise DataValidationError for an unknown category"""
+        data = ProductFactory().serialize()
+        for category in ["PETS", "name", "__doc__"]:
+            data["category"] = category
+            with self.assertRaises(DataValidationError):
+                Product().deserialize(data)
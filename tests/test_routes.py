@@ -13,6 +13,7 @@ import os
 import logging
 from decimal import Decimal
 from unittest import TestCase
+from unittest.mock import patch
 from service import app
 from service.common import status
 from service.models import db, init_db, Product
@@ -49,13 +50,13 @@ class TestProductRoutes(TestCase):
 
     # Utility method
     def _create_products(self, count=1):
-        products = []
-        for _ in range(count):
-            product = ProductFactory()
-            response = self.client.post(BASE_URL, json=product.serialize())
-            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-            product.id = response.get_json()["id"]
-            products.append(product)
+        products = [ProductFactory() for _ in range(count)]
+        response = self.client.post(
+            f"{BASE_URL}/bulk", json=[product.serialize() for product in products]
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        for product, created in zip(products, response.get_json()):
+            product.id = created["id"]
         return products
 
     # ----------------------------------------------------------
@@ -67,12 +68,30 @@ class TestProductRoutes(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn(b"Product Catalog Administration", response.data)
 
+    def test_index_not_modified(self):
+        """It should return 304 for an unchanged index page"""
+        response = self.client.get("/")
+        self.assertEqual(response.content_type, "text/html; charset=utf-8")
+        self.assertEqual(response.headers["Cache-Control"], "public, max-age=300")
+        etag = response.headers["ETag"]
+        response = self.client.get("/", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.data, b"")
+
     def test_health(self):
         """It should return health status"""
         response = self.client.get("/health")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.content_type, "application/json")
         self.assertEqual(response.get_json()["message"], "OK")
 
+    def test_method_not_allowed(self):
+        """It should return a JSON error for an unsupported method"""
+        response = self.client.patch(BASE_URL)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        self.assertEqual(response.content_type, "application/json")
+        self.assertEqual(response.get_json()["error"], "Method not Allowed")
+
     # ----------------------------------------------------------
     # CREATE
     # ----------------------------------------------------------
@@ -82,6 +101,7 @@ class TestProductRoutes(TestCase):
         response = self.client.post(BASE_URL, json=product.serialize())
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         data = response.get_json()
+        self.assertEqual(response.headers["Location"], f"http://localhost{BASE_URL}/{data['id']}")
         self.assertEqual(data["name"], product.name)
         self.assertEqual(data["description"], product.description)
         self.assertEqual(Decimal(data["price"]), product.price)
@@ -96,6 +116,11 @@ class TestProductRoutes(TestCase):
         response = self.client.post(BASE_URL, json=payload)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_create_product_malformed_json(self):
+        """It should not create a Product from malformed JSON"""
+        response = self.client.post(BASE_URL, data="{bad json", content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     def test_create_product_no_content_type(self):
         """It should not create a Product with no Content-Type"""
         response = self.client.post(BASE_URL, data="bad data")
@@ -106,6 +131,30 @@ class TestProductRoutes(TestCase):
         response = self.client.post(BASE_URL, data={}, content_type="plain/text")
         self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
 
+    def test_bulk_create_products(self):
+        """It should create many Products from one request"""
+        products = [ProductFactory() for _ in range(3)]
+        response = self.client.post(f"{BASE_URL}/bulk", json=[p.serialize() for p in products])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        data = response.get_json()
+        self.assertEqual([p["name"] for p in data], [p.name for p in products])
+        for created in data:
+            response = self.client.get(f"{BASE_URL}/{created['id']}")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_bulk_create_products_not_a_list(self):
+        """It should not bulk create Products from a JSON object"""
+        product = ProductFactory()
+        response = self.client.post(f"{BASE_URL}/bulk", json=product.serialize())
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_create_products_bad_item(self):
+        """It should not create any Products if one is invalid"""
+        payload = [ProductFactory().serialize(), {"name": "Nothing else"}]
+        response = self.client.post(f"{BASE_URL}/bulk", json=payload)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.get_product_count(), 0)
+
     # ----------------------------------------------------------
     # READ
     # ----------------------------------------------------------
@@ -117,17 +166,133 @@ class TestProductRoutes(TestCase):
         data = response.get_json()
         self.assertEqual(data["name"], product.name)
 
+    def test_get_product_not_modified(self):
+        """It should return 304 for a Product that has not changed"""
+        product = self._create_products(1)[0]
+        response = self.client.get(f"{BASE_URL}/{product.id}")
+        etag = response.headers["ETag"]
+        response = self.client.get(f"{BASE_URL}/{product.id}", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.data, b"")
+        self.assertEqual(response.headers["ETag"], etag)
+
+        payload = product.serialize()
+        payload["description"] = "Changed"
+        response = self.client.put(f"{BASE_URL}/{product.id}", json=payload)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(f"{BASE_URL}/{product.id}", headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.get_json()["description"], "Changed")
+
     def test_get_product_not_found(self):
         """It should return 404 for missing Product"""
         response = self.client.get(f"{BASE_URL}/0")
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertIn("was not found", response.get_json()["message"])
 
+    # ----------------------------------------------------------
+    # DELETE
+    # ----------------------------------------------------------
+    def test_delete_product(self):
+        """It should delete a Product"""
+        product = self._create_products(1)[0]
+        response = self.client.delete(f"{BASE_URL}/{product.id}")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(response.data, b"")
+        response = self.client.get(f"{BASE_URL}/{product.id}")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_delete_product_not_found(self):
+        """It should return 204 when deleting a missing Product"""
+        response = self.client.delete(f"{BASE_URL}/999999")
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(response.data, b"")
+
+    # ----------------------------------------------------------
+    # LIST
+    # ----------------------------------------------------------
+    def test_list_products(self):
+        """It should list all Products"""
+        self._create_products(5)
+        response = self.client.get(BASE_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.get_json()), 5)
+
+    def test_count_products(self):
+        """It should count the Products"""
+        self.assertEqual(self.get_product_count(), 0)
+        self._create_products(4)
+        self.assertEqual(self.get_product_count(), 4)
+
+    @patch("service.routes.ROW_BATCH_SIZE", 2)
+    def test_list_products_streamed_in_batches(self):
+        """It should stream a valid JSON array across several batches"""
+        products = self._create_products(5)
+        response = self.client.get(BASE_URL)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_streamed)
+        data = response.get_json()
+        self.assertEqual(sorted(p["id"] for p in data), sorted(p.id for p in products))
+
+    def test_list_products_not_modified(self):
+        """It should return 304 for a list that has not changed"""
+        products = self._create_products(3)
+        response = self.client.get(BASE_URL)
+        etag = response.headers["ETag"]
+        response = self.client.get(BASE_URL, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.client.delete(f"{BASE_URL}/{products[0].id}")
+        response = self.client.get(BASE_URL, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.get_json()), 2)
+
+    def test_list_products_by_name(self):
+        """It should list Products filtered by name"""
+        products = self._create_products(5)
+        name = products[0].name
+        count = len([p for p in products if p.name == name])
+        response = self.client.get(BASE_URL, query_string={"name": name})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.get_json()
+        self.assertEqual(len(data), count)
+        for product in data:
+            self.assertEqual(product["name"], name)
+
+    def test_list_products_by_category(self):
+        """It should list Products filtered by category"""
+        products = self._create_products(10)
+        category = products[0].category
+        count = len([p for p in products if p.category == category])
+        response = self.client.get(BASE_URL, query_string={"category": category.name.title()})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.get_json()
+        self.assertEqual(len(data), count)
+        for product in data:
+            self.assertEqual(product["category"], category.name)
+
+    def test_list_products_by_availability(self):
+        """It should list Products filtered by availability"""
+        products = self._create_products(10)
+        count = len([p for p in products if p.available])
+        response = self.client.get(BASE_URL, query_string={"available": "true"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = response.get_json()
+        self.assertEqual(len(data), count)
+        for product in data:
+            self.assertTrue(product["available"])
+        response = self.client.get(BASE_URL, query_string={"available": "no"})
+        self.assertEqual(len(response.get_json()), len(products) - count)
+
+    def test_list_products_invalid_category(self):
+        """It should not list Products for an unknown category"""
+        response = self.client.get(BASE_URL, query_string={"category": "bogus"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
     # ----------------------------------------------------------
     # Utility
     # ----------------------------------------------------------
     def get_product_count(self):
         """Returns the number of products in the database"""
-        response = self.client.get(BASE_URL)
+        response = self.client.get(f"{BASE_URL}/count")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        return len(response.get_json())
+        return response.get_json()["count"]